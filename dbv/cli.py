@@ -24,9 +24,13 @@ async def consume_keyboard_events(
     The buffer is consumed serially with no regard to timing, so if `keyboard_handler`
     is slow it may delay the execution of events and feel unnaturaly.
 
+    Reading happens in an executor so the event loop is free to run scheduled
+    refreshes while waiting on the next key.
+
     When `keyboard_handler` returns falsey, exit.
     """
-    while ch := get_char():
+    loop = asyncio.get_event_loop()
+    while ch := await loop.run_in_executor(None, get_char):
         should_continue = await keyboard_handler(ch, live.refresh)
         if not should_continue:
             break
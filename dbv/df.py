@@ -1,26 +1,115 @@
+import functools
+import itertools
+import os
+import threading
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from dask import dataframe as dd
 from rich.console import Console, ConsoleOptions, RenderResult
 from rich.table import Table
 
 
-def load_df(filename: str) -> dd.DataFrame:
-    """Load a dask DataFrame from a parquet file."""
-    return dd.read_parquet(filename)
+class ParquetSource:
+    """
+    A parquet file which is read lazily.
+
+    Windows of rows and columns are read straight from the file's row groups, so
+    browsing only decodes what is shown. The full dask DataFrame is only loaded the
+    first time it's asked for, eg. to filter.
+
+    Dataset directories and globs have no single file to read windows from, so
+    `file` and `schema` are None and they're read through `df` instead.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        # windows may be read from more than one thread, eg. when prefetching
+        self._lock = threading.Lock()
+        if not os.path.isfile(filename):
+            # A dataset directory or glob: there's no single file to read windows
+            # from, so everything goes through the dask DataFrame.
+            self.file = None
+            self.schema = None
+            self.meta = self.df._meta
+            self.columns: List[str] = list(self.meta.columns)
+            self.num_rows: int = len(self.df)
+            return
+
+        self.file = pq.ParquetFile(filename, pre_buffer=True)
+        self.schema = self.file.schema_arrow
+        # empty pandas frame with the file's columns and dtypes
+        self.meta = self.schema.empty_table().to_pandas()
+        self.columns = list(self.meta.columns)
+        self.num_rows = self.file.metadata.num_rows
+        # first row of each row group, followed by the total number of rows
+        self._row_group_offsets = list(
+            itertools.accumulate(
+                (
+                    self.file.metadata.row_group(i).num_rows
+                    for i in range(self.file.num_row_groups)
+                ),
+                initial=0,
+            )
+        )
+
+    @functools.cached_property
+    def df(self) -> dd.DataFrame:
+        """The whole file as a dask DataFrame, loaded on first use."""
+        # Persist so the parquet isn't re-read every time the interface renders.
+        return dd.read_parquet(self.filename).persist()
 
+    def read_window(
+        self, columns: List[str], row_range: Tuple[int, int]
+    ) -> pd.DataFrame:
+        """Read `columns` of the rows in [start, stop) from just the row groups holding them."""
+        start, stop = row_range
+        offsets = self._row_group_offsets
+        row_groups = [
+            i
+            for i in range(self.file.num_row_groups)
+            if offsets[i] < stop and offsets[i + 1] > start
+        ]
+        if not row_groups:
+            return self.meta[columns]
+
+        with self._lock:
+            table = self.file.read_row_groups(
+                row_groups, columns=columns, use_threads=True, use_pandas_metadata=True
+            )
+        window = table.slice(start - offsets[row_groups[0]], stop - start).to_pandas()
+        if isinstance(window.index, pd.RangeIndex):
+            # a default index restarts at 0 for the window; number rows within the file
+            window.index = pd.RangeIndex(start, start + len(window))
+        return window
+
+
+def load_df(filename: str) -> ParquetSource:
+    """Load a lazily-read parquet file."""
+    return ParquetSource(filename)
+
+
+def df_to_rich_table(
+    df: Union[dd.DataFrame, pd.DataFrame], title: Optional[str] = None
+) -> Table:
+    """Convert a dask or pandas DataFrame to a Rich table."""
+    if isinstance(df, dd.DataFrame):
+        df = df.compute()
 
-def df_to_rich_table(df: dd.DataFrame, title: Optional[str] = None) -> Table:
-    """Convert a dask DataFrame to a Rich table."""
     table = Table(title=title)
     table.add_column(" ")
     for column in df.columns:
         table.add_column(column)
 
-    for i, row in df.iterrows():
-        table.add_row(*map(str, [i, *row]))
+    # Convert every cell to a string up front rather than row by row.
+    index = df.index.map(str).to_numpy()
+    cells = df.astype(str).to_numpy()
+    for i, row in zip(index, cells):
+        table.add_row(i, *row)
 
     return table
 
@@ -35,7 +124,7 @@ class Schema:
     to be thrift-type aware.
     """
 
-    columns: Dict[str, np.dtype]
+    columns: Dict[str, Union[np.dtype, pa.DataType]]
 
     def __rich_console__(
         self, console: Console, options: ConsoleOptions
@@ -52,3 +141,21 @@ class Schema:
     def from_df(cls, df: dd.DataFrame) -> "Schema":
         """Construct a table schema from a dataframe."""
         return cls({col: getattr(df, col).dtype for col in df.columns})
+
+    @classmethod
+    def from_arrow(cls, schema: pa.Schema) -> "Schema":
+        """Construct a table schema from a pyarrow schema, eg. of a parquet file."""
+        # pandas stores its index as columns; they aren't part of the table's columns
+        pandas_metadata = schema.pandas_metadata or {}
+        index_columns = {
+            column
+            for column in pandas_metadata.get("index_columns", [])
+            if isinstance(column, str)
+        }
+        return cls(
+            {
+                field.name: field.type
+                for field in schema
+                if field.name not in index_columns
+            }
+        )
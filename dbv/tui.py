@@ -1,11 +1,16 @@
+import asyncio
+import datetime
 import enum
 import functools
 import itertools
-import operator
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
-
-import numpy as np
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
 from dask import dataframe as dd
 from rich.color import Color, parse_rgb_hex
 from rich.console import Console, ConsoleOptions, ConsoleRenderable, RenderResult
@@ -18,7 +23,7 @@ from rich.styled import Styled
 from rich.table import Column, Table
 from rich.text import Text
 
-from dbv.df import Schema
+from dbv.df import ParquetSource, Schema
 
 bg_color = Color.from_triplet(parse_rgb_hex("1D1F21"))
 bg_color_secondary = Color.from_triplet(parse_rgb_hex("101214"))
@@ -54,8 +59,8 @@ class Mode(enum.Enum):
     HELP = "(?)help"
 
 
-def mode_line(current_mode: Mode) -> Layout:
-    """Render the UI mode line."""
+def _build_mode_line(current_mode: Mode) -> Layout:
+    """Build the UI mode line layout for a mode."""
     line = Layout(name="mode_line", size=1)
 
     inactive_style = "black on white"
@@ -75,6 +80,15 @@ def mode_line(current_mode: Mode) -> Layout:
     return line
 
 
+# The mode line only depends on the mode, so build each one up front.
+_MODE_LINES = {mode: _build_mode_line(mode) for mode in Mode}
+
+
+def mode_line(current_mode: Mode) -> Layout:
+    """Render the UI mode line."""
+    return _MODE_LINES[current_mode]
+
+
 class Help:
     """Rich-renderable command help page."""
 
@@ -105,27 +119,64 @@ class Summary:
 
     # Rich-renderable summary pane for a DataFrame.
 
-    def __init__(self, df: dd.DataFrame):
-        self.df = df
+    def __init__(self, schema_or_df: Union[pa.Schema, dd.DataFrame]):
+        # The schema of a loaded file doesn't change, so only work it out once.
+        if isinstance(schema_or_df, pa.Schema):
+            self._schema = Schema.from_arrow(schema_or_df)
+        else:
+            self._schema = Schema.from_df(schema_or_df)
 
     def __rich__(self) -> ConsoleRenderable:
-        return Schema.from_df(self.df)
+        return self._schema
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_expr(filter_string: str) -> CodeType:
+    """Parse and compile a filter expression, once per distinct filter string."""
+    return compile(filter_string, "<filter>", "eval")
+
+
+# The most recent dataframe with its column set and namespace; filters run against the
+# same df on every render, so there's no need to rebuild these each time.
+_namespace_cache: Tuple[Optional[dd.DataFrame], FrozenSet[str], Dict[str, Any]] = (
+    None,
+    frozenset(),
+    {},
+)
+
+
+def _column_namespace(df: dd.DataFrame) -> Tuple[FrozenSet[str], Dict[str, Any]]:
+    """Get the set of columns of `df`, and a namespace of `df` and its columns."""
+    global _namespace_cache
+    cached_df, columns, namespace = _namespace_cache
+    if cached_df is not df:
+        names = tuple(df.columns)
+        columns = frozenset(names)
+        namespace = {"df": df, **{col: df[col] for col in names}}
+        _namespace_cache = (df, columns, namespace)
+    return columns, namespace
 
 
 def compile_filter(filter_string: str) -> Callable[[dd.DataFrame], any]:
     """Compile a filter string into a dataframe filter."""
+    # Adding whitespace to a column name compiles as a filter that fails later,
+    # so strip whitespace to degrade to at least just showing that column
+    column = filter_string.strip()
 
     def _compiled_filter(df: dd.DataFrame) -> any:
         """Compiled filter function."""
-        # If it's a column, just return the series.
-        # Adding whitespace to a column name compiles as a filter that fails later,
-        # so strip whitespace to degrade to at least just showing that column
-        if filter_string.strip() in df.columns:
-            return getattr(df, filter_string.strip())
+        columns, namespace = _column_namespace(df)
 
-        # Add columns into locals so that they may be referred to directly
-        locals().update({col: getattr(df, col) for col in df.columns})
-        evaluated = eval(filter_string, None, locals())  # noqa: S307
+        # If it's a column, just return the series without evaluating anything.
+        if column in columns:
+            return namespace[column]
+
+        # Columns are in the namespace so that they may be referred to directly.
+        # eval gets a copy, so names assigned by the filter (eg. with :=) can't leak
+        # into the cached namespace used by later filters.
+        evaluated = eval(  # noqa: S307
+            _compile_expr(filter_string), None, dict(namespace)
+        )
 
         # Index the df by the evaluated filter
         return df[evaluated]
@@ -133,16 +184,65 @@ def compile_filter(filter_string: str) -> Callable[[dd.DataFrame], any]:
     return _compiled_filter
 
 
+def _rows_containing(df: pd.DataFrame, text: str) -> pd.Series:
+    """Mask of the rows of `df` where any cell, as a string, contains `text`."""
+    # Join each row's cells (null separated, so matches can't span cells) and search
+    # once, rather than searching every column separately and combining the results.
+    # astype(str) rather than map(str), which keeps categoricals categorical (and they
+    # can't be concatenated). Missing cells may stay missing; don't let them blank out
+    # the rest of the row.
+    row_text = functools.reduce(
+        lambda left, right: left + "\0" + right,
+        [df[col].astype(str).fillna("") for col in df.columns],
+    )
+    return row_text.str.contains(text, regex=False)
+
+
+def _format_any(v: Any) -> ConsoleRenderable:
+    """Format a table cell of any type."""
+    return Text(v, no_wrap=True) if isinstance(v, str) else Pretty(v, no_wrap=True)
+
+
+def _format_number(v: Any) -> ConsoleRenderable:
+    """Format a number the way Pretty would, without going through Pretty."""
+    return Text(no_wrap=True).append(repr(v), style="repr.number")
+
+
+# Formatters for the most common cell types, looked up by exact type.
+_FORMATTERS: Dict[type, Callable[[Any], ConsoleRenderable]] = {
+    str: lambda v: Text(v, no_wrap=True),
+    int: _format_number,
+    float: _format_number,
+    datetime.date: lambda v: Text(str(v), no_wrap=True),
+}
+
+
+def format_cell(v: Any) -> ConsoleRenderable:
+    """Format a table cell as a renderable."""
+    return _FORMATTERS.get(type(v), _format_any)(v)
+
+
 class TableView:
     """Show the database as a table."""
 
     # Rich-renderable summary pane for a DataFrame.
 
-    def __init__(self, df: dd.DataFrame):
-        self.df = df
+    # number of recently read pages (and filters' row counts) to keep
+    page_cache_size = 8
+
+    def __init__(self, source: ParquetSource):
+        self.source = source
+        self._nrows = source.num_rows
         self._last_page_size = 0
         self._startat = 0
         self._column_startat = 0
+        # Recently read pages, and per-partition row counts of recently filtered frames
+        # keyed by filter. Both are shared with the prefetch thread, so use the lock.
+        self._page_cache: "OrderedDict[tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lengths_cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._page_cache_lock = threading.Lock()
+        # the columns of the last rendered page, for prefetching
+        self._last_columns = slice(0, 0)
         self._filter = CaptureKeyboardInput(
             prompt="filter: ", update=CaptureKeyboardInput.exit_on_return
         )
@@ -155,7 +255,7 @@ class TableView:
     @startat.setter
     def startat(self, startat: int) -> None:
         """Setter for startat."""
-        self._startat = min(len(self.df) - 1, max(0, startat))
+        self._startat = min(self._nrows - 1, max(0, startat))
 
     @property
     def column_startat(self) -> int:
@@ -165,7 +265,12 @@ class TableView:
     @column_startat.setter
     def column_startat(self, column_startat: int) -> None:
         """Setter for column_startat."""
-        self._column_startat = min(len(self.df.columns) - 1, max(0, column_startat))
+        self._column_startat = min(len(self.source.columns) - 1, max(0, column_startat))
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        """The row and column the table is scrolled to."""
+        return self.startat, self.column_startat
 
     def increment_page(self) -> None:
         """Increment startat by the last known page size."""
@@ -182,6 +287,118 @@ class TableView:
             return self._filter.value
         return None
 
+    def _filtered(self, filter_string: Optional[str], columns: slice) -> dd.DataFrame:
+        """Filter the df by `filter_string`, if any, keeping only `columns`."""
+
+        # compile and execute the filter
+        # the filter against all columns
+        def filter(df: dd.DataFrame) -> dd.DataFrame:
+            try:
+                filter = compile_filter(filter_string)
+                filtered = filter(df)
+                if not isinstance(filtered, dd.DataFrame):
+                    # It's a series, to turn it into a DataFrame
+                    return filtered.to_frame()
+                return filtered
+            except Exception:
+                # if the filter doesn't compile or otherwise fails, then just directly apply
+                return df[
+                    df.map_partitions(
+                        _rows_containing, filter_string, meta=(None, bool)
+                    )
+                ]
+
+        return (
+            self.source.df
+            # apply filter
+            .pipe(filter if filter_string else lambda df: df)
+            # start at self.column_startat
+            .pipe(lambda df: df.iloc[:, columns])
+        )
+
+    def _lengths(
+        self, filtered: dd.DataFrame, filter_string: Optional[str]
+    ) -> List[int]:
+        """Row counts for each partition of the filtered frame, cached per filter."""
+        with self._page_cache_lock:
+            if filter_string in self._lengths_cache:
+                self._lengths_cache.move_to_end(filter_string)
+                return self._lengths_cache[filter_string]
+
+        lengths = list(filtered.map_partitions(len).compute())
+
+        with self._page_cache_lock:
+            self._lengths_cache[filter_string] = lengths
+            if len(self._lengths_cache) > self.page_cache_size:
+                self._lengths_cache.popitem(last=False)
+        return lengths
+
+    def _page(
+        self,
+        filtered: dd.DataFrame,
+        filter_string: Optional[str],
+        start: int,
+        stop: int,
+    ) -> pd.DataFrame:
+        """Compute only the partitions overlapping rows [start, stop) and slice them."""
+        pieces = []
+        offset = 0
+        for i, length in enumerate(self._lengths(filtered, filter_string)):
+            if offset >= stop:
+                break
+            if offset + length > start:
+                partition = filtered.partitions[i].compute()
+                pieces.append(
+                    partition.iloc[max(0, start - offset) : stop - offset]  # noqa: E203
+                )
+            offset += length
+        if not pieces:
+            return filtered._meta
+        return pd.concat(pieces)
+
+    def _read_page(
+        self, filter_string: Optional[str], start: int, stop: int, columns: slice
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Read rows [start, stop) of `columns`, and the total number of rows.
+
+        Pages are cached, so pages which have been prefetched don't need reading again.
+        """
+        key = (filter_string, start, stop, columns.start, columns.stop)
+        with self._page_cache_lock:
+            if key in self._page_cache:
+                self._page_cache.move_to_end(key)
+                return self._page_cache[key]
+
+        if filter_string or self.source.file is None:
+            filtered = self._filtered(filter_string, columns)
+            page = self._page(filtered, filter_string, start, stop)
+            total_rows = sum(self._lengths(filtered, filter_string))
+        else:
+            # Unfiltered, so read just the window straight from the file.
+            page = self.source.read_window(self.source.columns[columns], (start, stop))
+            total_rows = self._nrows
+
+        with self._page_cache_lock:
+            self._page_cache[key] = page, total_rows
+            if len(self._page_cache) > self.page_cache_size:
+                self._page_cache.popitem(last=False)
+        return page, total_rows
+
+    def prefetch(self) -> None:
+        """Read the pages before and after the last rendered page into the cache."""
+        if self._filter.editing:
+            # The filter is likely half typed, and a prefetch can't be cancelled, so
+            # don't start a read (and dask compute) for it.
+            return
+        filter_string = self.filter
+        height = self._last_page_size
+        for start in (self.startat + height, self.startat - height):
+            if height > 0 and 0 <= start < self._nrows:
+                self._read_page(
+                    filter_string, start, start + height, self._last_columns
+                )
+
     def __rich_console__(
         self, console: Console, options: ConsoleOptions
     ) -> RenderResult:
@@ -199,72 +416,47 @@ class TableView:
         # saved for page increment
         self._last_page_size = height
 
-        # compile and execute the filter
-        # the filter against all columns
-        def filter(df: dd.DataFrame) -> dd.DataFrame:
-            try:
-                filter = compile_filter(self.filter)
-                filtered = filter(df)
-                if not isinstance(filtered, dd.DataFrame):
-                    # It's a series, to turn it into a DataFrame
-                    return filtered.to_frame()
-                return filtered
-            except Exception:
-                # if the filter doesn't compile or otherwise fails, then just directly apply
-                if self.filter:
-                    return df[
-                        functools.reduce(
-                            operator.__or__,
-                            [
-                                getattr(df, col)
-                                .map(str)
-                                .str.contains(self.filter, regex=False)
-                                for col in df.columns
-                            ],
-                        )
-                    ]
-                return df
-
-        filtered = (
-            self.df
-            # apply filter
-            .pipe(filter)
-            # start at self.column_startat
-            .pipe(lambda df: df.iloc[:, self.column_startat :])  # noqa: E203
-        )
-        paged = list(
-            itertools.islice(filtered.itertuples(), self.startat, self.startat + height)
+        # Each rendered column takes up at least one character plus a separator, so
+        # no more than this many columns from self.column_startat can possibly fit.
+        visible_columns = slice(self.column_startat, self.column_startat + width // 2)
+
+        self._last_columns = visible_columns
+
+        page, total_rows = self._read_page(
+            self.filter, self.startat, self.startat + height, visible_columns
         )
 
-        def format(v: any) -> ConsoleRenderable:
-            return (
-                Text(v, no_wrap=True) if isinstance(v, str) else Pretty(v, no_wrap=True)
-            )
+        # Format each cell once; the renderables are used for measuring and rendering.
+        paged = [[format_cell(v) for v in row] for row in page.itertuples()]
 
         table = Table(expand=True, row_styles=[body_style, body_style_secondary])
 
         # The following code computes the number of columns we can comfortable render
         # in the space, starting at self.column_startat, before finally trimming down
         # to just those columns and then rendering.
-        column_names = [" ", *filtered.columns]
+        column_names = [" ", *page.columns]
         columns = [
-            Column(name, _cells=[format(v) for v in values])
-            for name, values in zip(column_names, zip(*paged))
+            Column(name, _cells=list(cells))
+            for name, cells in zip(column_names, zip(*paged))
         ]
 
         column_widths = [
             table._measure_column(console, options, column) for column in columns
         ]
         # +1 for column separator
-        max_column_widths = np.array([width.maximum for width in column_widths]) + 1
-        total_width = np.add.accumulate(max_column_widths)
-        # np.where returns tuple of list of elements for each dimension.
-        cant_render = np.where(total_width > width)[0]
+        total_width = list(
+            itertools.accumulate(
+                column_width.maximum + 1 for column_width in column_widths
+            )
+        )
+        # the first column index we don't have space for, if there is one.
+        cant_render = next(
+            (i for i, used_width in enumerate(total_width) if used_width > width), None
+        )
 
-        # cant_render[0], if it exists, is the first column index we don't have space for.
-        if cant_render.size:  # np.ndarray
+        if cant_render is not None:
             # always render at least 1 column.
-            max_column = max(cant_render[0], 1)
+            max_column = max(cant_render, 1)
             # heuristic: we've got some room, render one column with overflow.
             if max_column < len(columns):
                 available_width = width - total_width[max_column - 1]
@@ -277,10 +469,10 @@ class TableView:
             table.add_column(column_name)
 
         for row in paged:
-            table.add_row(*map(format, row))
+            table.add_row(*row)
 
         yield table
-        yield f"... {len(filtered)} total rows"
+        yield f"... {total_rows} total rows"
 
 
 @dataclass
@@ -288,19 +480,31 @@ class CaptureKeyboardInput:
     """Editing callback class used to capture keyboard input to the interface."""
 
     prompt: Optional[str] = None
-    value: str = ""
     editing: bool = False
     update: Callable[["CaptureKeyboardInput", str], bool] = lambda cap, s: True
     finalize: Callable[["CaptureKeyboardInput"], None] = lambda cap: None
+    # characters typed so far; appending to a list avoids copying the string per key
+    _chars: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def value(self) -> str:
+        """The text typed so far."""
+        return "".join(self._chars)
+
+    @value.setter
+    def value(self, value: str) -> None:
+        """Setter for value."""
+        self._chars = list(value)
 
     def send_character(self, ch: str) -> bool:
         """Evaluate the next character, update the "editor", and send value to update callback."""
         if ch in (BACKSPACE, CTRL_H):
-            self.value = self.value[:-1]
+            if self._chars:
+                self._chars.pop()
         elif ch == CTRL_K:
-            self.value = ""
+            self._chars.clear()
         else:
-            self.value += ch
+            self._chars.append(ch)
         return self.update(self, self.value)
 
     @staticmethod
@@ -362,15 +566,53 @@ class Interface:
     commands = {}
     table_commands = {}
 
-    def __init__(self, df: dd.DataFrame, title: str):
-        self.df = df
-        self.summary = Summary(self.df)
-        self.table = TableView(self.df)
+    # seconds to wait for more input before refreshing
+    refresh_delay = 0.016
+
+    def __init__(self, source: ParquetSource, title: str):
+        self.source = source
+        self.summary = Summary(
+            self.source.df if self.source.schema is None else self.source.schema
+        )
+        self.table = TableView(self.source)
         self.mode = Mode.TABLE
         self.help = Help(
             {"Mode Commands": self.commands, "Table Commands": self.table_commands}
         )
         self.editing = None
+        self._pending_refresh: Optional[asyncio.Future] = None
+        self._pending_prefetch: Optional[asyncio.Future] = None
+
+    def _schedule_refresh(self, refresh: Callable[[], None]) -> None:
+        """
+        Refresh after a short delay, unless a refresh is already pending.
+
+        Bursts of keypresses (eg. holding down `j`) are coalesced into a single render
+        rather than rendering once per key.
+        """
+        if self._pending_refresh is not None and not self._pending_refresh.done():
+            return
+
+        async def _refresh() -> None:
+            await asyncio.sleep(self.refresh_delay)
+            refresh()
+            self._prefetch()
+
+        self._pending_refresh = asyncio.ensure_future(_refresh())
+
+    def _prefetch(self) -> None:
+        """Warm the table's page cache in a background thread, if not already doing so."""
+        if self.mode != Mode.TABLE:
+            return
+        if self._pending_prefetch is not None and not self._pending_prefetch.done():
+            return
+        loop = asyncio.get_event_loop()
+        self._pending_prefetch = loop.run_in_executor(None, self.table.prefetch)
+
+    def _refresh_if_moved(self, position: Tuple[int, int], refresh: Callable) -> None:
+        """Schedule a refresh if the table has scrolled away from `position`."""
+        if self.table.position != position:
+            self._schedule_refresh(refresh)
 
     async def keyboard_handler(self, ch: str, refresh: Callable[[], None]) -> bool:
         """
@@ -385,7 +627,7 @@ class Interface:
                 self.editing.finalize(self.editing)
                 self.editing.editing = False
                 self.editing = None
-            refresh()
+            self._schedule_refresh(refresh)
             return True
 
         # If the command is registered, call it
@@ -436,7 +678,7 @@ class Interface:
 
         self.editing = self.table._filter
         self.editing.editing = True
-        refresh()
+        self._schedule_refresh(refresh)
         return True
 
     # switch modes (TODO: input modes)
@@ -444,68 +686,76 @@ class Interface:
     def summary_mode(self, refresh: Callable) -> bool:
         """Show a summary of the database"""
         self.mode = Mode.SUMMARY
-        refresh()
+        self._schedule_refresh(refresh)
         return True
 
     @add_command(commands, "t", "(t)able")
     def table_mode(self, refresh: Callable) -> bool:
         """Show the database as a table"""
         self.mode = Mode.TABLE
-        refresh()
+        self._schedule_refresh(refresh)
         return True
 
     # TABLE MODE: table navigation (TODO: arrow keys)
     @add_command(table_commands, "h", "scroll left")
     def scroll_left(self, refresh: Callable) -> bool:
         """Scroll left one column in the table view"""
+        position = self.table.position
         self.table.column_startat -= 1
-        refresh()
+        self._refresh_if_moved(position, refresh)
         return True
 
     @add_command(table_commands, "j", "scroll down")
     def scroll_down(self, refresh: Callable) -> bool:
         """Scroll down one page in the table view"""
+        position = self.table.position
         self.table.increment_page()
-        refresh()
+        self._refresh_if_moved(position, refresh)
         return True
 
     @add_command(table_commands, "k", "scroll up")
     def scroll_up(self, refresh: Callable) -> bool:
         """Scroll up one page in the table view"""
+        position = self.table.position
         self.table.decrement_page()
-        refresh()
+        self._refresh_if_moved(position, refresh)
         return True
 
     @add_command(table_commands, "l", "scroll right")
     def scroll_right(self, refresh: Callable) -> bool:
         """Scroll right one column in the table view"""
+        position = self.table.position
         self.table.column_startat += 1
-        refresh()
+        self._refresh_if_moved(position, refresh)
         return True
 
     @add_command(table_commands, "g", "Go to top")
     def go_to_top(self, refresh: Callable) -> bool:
         """Go to the top of the table"""
+        position = self.table.position
         self.table.startat = 0
-        refresh()
+        self._refresh_if_moved(position, refresh)
         return True
 
     @add_command(table_commands, "G", "Go to bottom")
     def go_to_bottom(self, refresh: Callable) -> bool:
         """Go to the bottom of the table"""
-        self.table.startat = len(self.df) - self.table._last_page_size
-        refresh()
+        position = self.table.position
+        self.table.startat = self.table._nrows - self.table._last_page_size
+        self._refresh_if_moved(position, refresh)
         return True
 
     # quit (TODO: if input is lagged, doesn't work)
     @add_command(commands, "q", "(q)uit")
     def quit(self, refresh: Callable) -> bool:
         """Quit"""
+        if self._pending_refresh is not None:
+            self._pending_refresh.cancel()
         return False
 
     @add_command(commands, "?", "help")
     def show_help(self, refresh: Callable) -> bool:
         """Show this help page"""
         self.mode = Mode.HELP
-        refresh()
+        self._schedule_refresh(refresh)
         return True
@@ -3,9 +3,11 @@ import enum
 import random
 from collections import namedtuple
 from itertools import islice, starmap
-from typing import Any, Dict, Generator, Iterator, Tuple
+from typing import Any, Callable, Dict, Generator, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from faker import Faker
 
 
@@ -37,6 +39,16 @@ class Columns(enum.Enum):
 
 DEFAULT_COLUMNS = tuple(Columns)
 
+# fmt: off
+STATES_ABBR = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
+    "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
+    "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+    "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
+    "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)
+# fmt: on
+
 
 class DataGenerator:
     """Generates tables of data in either row or column format.
@@ -49,6 +61,8 @@ class DataGenerator:
 
     gen_rows()
     gen_table()
+    gen_arrow_table()
+    gen_pandas_df()
     """
 
     def __init__(
@@ -59,7 +73,10 @@ class DataGenerator:
         self.columns = columns
         self.headers = self._get_headers()
         self.data_generators = self._get_data_generators()
-        self.faker = Faker(seed=seed)
+        self.batch_generators = self._get_batch_generators()
+        self.faker = Faker()
+        self.faker.seed_instance(seed)
+        self.rng = np.random.default_rng(seed)
 
     def _get_headers(self) -> Tuple[str]:
         """Retuns a tuple of headers for the columns"""
@@ -89,6 +106,20 @@ class DataGenerator:
 
         return tuple(generator_dict[col] for col in self.columns)
 
+    def _get_batch_generators(self) -> Tuple[Callable[[int], List[Any]]]:
+        """Returns a tuple of the batch data generators for the columns"""
+        batch_dict = {
+            Columns.NAME: self._gen_names_batch,
+            Columns.ADDRESS: self._gen_addresses_batch,
+            Columns.PHONE_NUMBER: self._gen_phone_numbers_batch,
+            Columns.DATE_OF_BIRTH: self._gen_birth_dates_batch,
+            Columns.JOB: self._gen_jobs_batch,
+            Columns.BANK_ACCOUNT: self._gen_bank_accounts_batch,
+            Columns.SSN: self._gen_ssns_batch,
+        }
+
+        return tuple(batch_dict[col] for col in self.columns)
+
     def _name_generator(self) -> str:
         """Infinite iterator to produce full names"""
         while True:
@@ -107,19 +138,10 @@ class DataGenerator:
             "zipcode": int, # not actually smart, but good for testing types
         }
         """
-        # fmt: off
-        states_abbr = (
-            "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
-            "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
-            "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
-            "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
-            "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
-        )
-        # fmt: on
         while True:
             yield {
                 "address": self.faker.street_address(),
-                "state": random.choice(states_abbr),
+                "state": random.choice(STATES_ABBR),
                 "city": self.faker.city(),
                 "zipcode": self.faker.postcode(),
             }
@@ -149,6 +171,58 @@ class DataGenerator:
         while True:
             yield self.faker.ssn()
 
+    def _gen_names_batch(self, n: int) -> List[str]:
+        """List of `n` full names"""
+        names = np.array([self.faker.name() for _ in range(n)], dtype=object)
+
+        # Decide which names get a prefix/suffix all at once, then only generate those
+        has_prefix = self.rng.random(n) < 0.1
+        has_suffix = self.rng.random(n) < 0.1
+        prefixes = np.full(n, "", dtype=object)
+        prefixes[has_prefix] = [
+            f"{self.faker.prefix()} " for _ in range(np.count_nonzero(has_prefix))
+        ]
+        suffixes = np.full(n, "", dtype=object)
+        suffixes[has_suffix] = [
+            f" {self.faker.suffix()}" for _ in range(np.count_nonzero(has_suffix))
+        ]
+
+        return (prefixes + names + suffixes).tolist()
+
+    def _gen_addresses_batch(self, n: int) -> List[Dict]:
+        """List of `n` address dictionaries, as produced by `_address_generator`"""
+        return [
+            {
+                "address": self.faker.street_address(),
+                "state": state,
+                "city": self.faker.city(),
+                "zipcode": self.faker.postcode(),
+            }
+            for state in random.choices(STATES_ABBR, k=n)
+        ]
+
+    def _gen_phone_numbers_batch(self, n: int) -> List[str]:
+        """List of `n` phone numbers"""
+        return [self.faker.phone_number() for _ in range(n)]
+
+    def _gen_birth_dates_batch(self, n: int) -> List[datetime.date]:
+        """List of `n` dates of birth"""
+        return [
+            self.faker.date_of_birth(minimum_age=18, maximum_age=77) for _ in range(n)
+        ]
+
+    def _gen_jobs_batch(self, n: int) -> List[str]:
+        """List of `n` jobs"""
+        return [self.faker.job() for _ in range(n)]
+
+    def _gen_bank_accounts_batch(self, n: int) -> List[str]:
+        """List of `n` bank account IDs"""
+        return [self.faker.bban() for _ in range(n)]
+
+    def _gen_ssns_batch(self, n: int) -> List[str]:
+        """List of `n` social security numbers"""
+        return [self.faker.ssn() for _ in range(n)]
+
     def gen_rows(self, num_rows: int = None) -> Iterator[namedtuple]:
         """Returns an iterator of size `num_rows` of namedtuples in a row format"""
         Row = namedtuple("Row", self.headers)
@@ -161,6 +235,18 @@ class DataGenerator:
         return Table(*(tuple(islice(data_generator, num_rows)) for data_generator in self.data_generators))
         # fmt: on
 
-    def gen_pandas_df(self, num_rows: int = None) -> pd.DataFrame:
+    def gen_arrow_table(self, num_rows: int) -> pa.Table:
+        """Returns the data as a pyarrow table, generated a column at a time"""
+        return pa.Table.from_arrays(
+            [
+                pa.array(batch_generator(num_rows))
+                for batch_generator in self.batch_generators
+            ],
+            names=list(self.headers),
+        )
+
+    def gen_pandas_df(self, num_rows: int) -> pd.DataFrame:
         """Returns the data as a pandas dataframe"""
-        return pd.DataFrame(self.gen_rows(num_rows))
+        return self.gen_arrow_table(num_rows).to_pandas(
+            self_destruct=True, zero_copy_only=False
+        )